@@ -4,18 +4,11 @@ Persona-Driven Document Intelligence System
 Main entry point for processing documents based on persona and job-to-be-done
 """
 
-import json
 import time
 import argparse
 from pathlib import Path
-from datetime import datetime
 from typing import List, Dict, Any
 
-from src.document_processor import DocumentProcessor
-from src.persona_analyzer import PersonaAnalyzer
-from src.relevance_ranker import RelevanceRanker
-from src.output_formatter import OutputFormatter
-
 
 def main():
     parser = argparse.ArgumentParser(description="Persona-Driven Document Intelligence")
@@ -23,13 +16,22 @@ def main():
     parser.add_argument("--persona", type=str, required=True, help="Persona description")
     parser.add_argument("--job", type=str, required=True, help="Job-to-be-done description")
     parser.add_argument("--output", type=str, default="output.json", help="Output JSON file path")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse PDFs instead of using cached results")
     
     args = parser.parse_args()
     
     start_time = time.time()
     
+    # Imported after argument parsing so --help and usage errors skip loading
+    # the PDF and scoring dependencies
+    from src.document_processor import DocumentProcessor, DEFAULT_CACHE_DIR
+    from src.persona_analyzer import PersonaAnalyzer
+    from src.relevance_ranker import RelevanceRanker
+    from src.output_formatter import OutputFormatter
+    
     # Initialize components
-    doc_processor = DocumentProcessor()
+    doc_processor = DocumentProcessor(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
     persona_analyzer = PersonaAnalyzer()
     relevance_ranker = RelevanceRanker()
     output_formatter = OutputFormatter()
@@ -51,7 +53,8 @@ def main():
     ranked_sections = relevance_ranker.rank_sections(
         extracted_sections, 
         persona_profile, 
-        args.job
+        args.job,
+        top_k=max(output_formatter.top_k_extracted, output_formatter.top_k_subsection)
     )
     
     # Format output
@@ -64,8 +67,7 @@ def main():
     )
     
     # Save output
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    output_formatter.save_output(output_data, args.output, pretty=args.pretty)
     
     processing_time = time.time() - start_time
     print(f"Processing completed in {processing_time:.2f} seconds")
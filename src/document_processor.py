@@ -3,15 +3,31 @@ Document Processor for PDF text extraction and section identification
 """
 
 import os
-import re
+import functools
+import hashlib
+import itertools
 import logging
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Tuple, Optional
+import pymupdf
 import pdfplumber
 from dataclasses import dataclass
 
+from .section_scanner import scan_sections
 
-@dataclass
+
+# Documents with more pages than this have their pages extracted in parallel
+PARALLEL_PAGE_THRESHOLD = 100
+
+# Parsed documents are cached here, keyed by file path, size and mtime
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "persona_doc"
+# Bump when section extraction changes so stale cache entries are ignored
+_CACHE_VERSION = 3
+
+
+@dataclass(slots=True)
 class DocumentSection:
     """Represents a section extracted from a document"""
     document_name: str
@@ -22,7 +38,7 @@ class DocumentSection:
     end_position: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """Represents a processed document"""
     name: str
@@ -34,20 +50,15 @@ class Document:
 class DocumentProcessor:
     """Handles PDF document processing and section extraction"""
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
         self.logger = logging.getLogger(__name__)
-        # Common section header patterns
-        self.section_patterns = [
-            r'^(\d+\.?\s+[A-Z][^.!?]*(?:[.!?]|$))',  # Numbered sections
-            r'^([A-Z][A-Z\s]{2,}[^.!?]*(?:[.!?]|$))',  # ALL CAPS headers
-            r'^(Abstract|Introduction|Methodology|Results|Discussion|Conclusion|References)',  # Common academic sections
-            r'^(Executive Summary|Background|Analysis|Findings|Recommendations)',  # Business sections
-            r'^(Chapter \d+|Section \d+|Part \d+)',  # Textbook sections
-        ]
+        # Number of worker processes used to parse PDFs (defaults to CPU count)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Directory for cached parse results (None disables caching)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
     
     def load_documents(self, documents_path: str) -> List[Document]:
         """Load all PDF documents from the specified directory"""
-        documents = []
         doc_dir = Path(documents_path)
         
         if not doc_dir.exists():
@@ -57,9 +68,32 @@ class DocumentProcessor:
         if not pdf_files:
             raise ValueError(f"No PDF files found in: {documents_path}")
         
-        for pdf_file in pdf_files:
+        # Documents are independent, so parse them in parallel across processes.
+        # Spare workers are handed to each document for page-level parallelism.
+        max_workers = min(self.max_workers, len(pdf_files))
+        if max_workers <= 1:
+            # A single worker would only add process start-up and a pickle
+            # round trip for every document, cached or not
+            return self._collect_documents(
+                (pdf_file, functools.partial(self._process_document, pdf_file)) for pdf_file in pdf_files
+            )
+        
+        page_workers = max(1, self.max_workers // len(pdf_files))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_process_document, pdf_file, self.cache_dir, page_workers): pdf_file
+                for pdf_file in pdf_files
+            }
+            
+            # Collect in submission order so the output stays deterministic
+            return self._collect_documents((pdf_file, future.result) for future, pdf_file in futures.items())
+    
+    def _collect_documents(self, pending: Iterable[Tuple[Path, Callable[[], Document]]]) -> List[Document]:
+        """Gather processed documents in order, logging and skipping any that fail"""
+        documents = []
+        for pdf_file, get_document in pending:
             try:
-                doc = self._process_document(pdf_file)
+                doc = get_document()
                 documents.append(doc)
                 self.logger.info(f"Processed document: {pdf_file.name}")
             except Exception as e:
@@ -69,82 +103,128 @@ class DocumentProcessor:
         return documents
     
     def _process_document(self, pdf_path: Path) -> Document:
-        """Process a single PDF document"""
-        sections = []
+        """Process a single PDF document, reusing a cached result when the file is unchanged"""
+        cache_path = self._cache_path(pdf_path)
+        if cache_path is not None:
+            cached = self._load_cached_document(cache_path)
+            if cached is not None:
+                return cached
         
-        full_text = ""
-        page_texts = {}
+        sections = []
         
-        # Extract text from all pages using pdfplumber
-        with pdfplumber.open(str(pdf_path)) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                text = page.extract_text() or ""
-                page_texts[page_num] = text
-                full_text += f"\n[PAGE {page_num + 1}]\n{text}"
+        page_texts = self._extract_page_texts(pdf_path)
         
         # Extract sections
-        sections = self._extract_sections(full_text, page_texts, pdf_path.name)
+        sections = self._extract_sections(page_texts, pdf_path.name)
         
-        return Document(
+        document = Document(
             name=pdf_path.name,
             path=str(pdf_path),
             total_pages=len(page_texts),
             sections=sections
         )
+        
+        if cache_path is not None:
+            self._store_cached_document(cache_path, document)
+        
+        return document
     
-    def _extract_sections(self, full_text: str, page_texts: Dict[int, str], doc_name: str) -> List[DocumentSection]:
-        """Extract sections from document text"""
-        sections = []
-        lines = full_text.split('\n')
+    def _cache_path(self, pdf_path: Path) -> Optional[Path]:
+        """Get the cache file for a PDF, keyed by its path, size and modification time"""
+        if self.cache_dir is None:
+            return None
         
-        current_section = None
-        current_content = []
-        current_page = 1
+        stat = pdf_path.stat()
+        key = hashlib.blake2b(
+            f"{_CACHE_VERSION}:{pdf_path}:{stat.st_size}:{stat.st_mtime_ns}".encode(),
+            digest_size=16
+        ).hexdigest()
+        return self.cache_dir / f"{key}.pkl"
+    
+    def _load_cached_document(self, cache_path: Path) -> Optional[Document]:
+        """Load a cached document, returning None if missing or unreadable"""
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cache entry {cache_path.name}: {e}")
+            return None
+    
+    def _store_cached_document(self, cache_path: Path, document: Document) -> None:
+        """Write a document to the cache, ignoring failures"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial entry
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(document, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {cache_path.name}: {e}")
+    
+    def _extract_page_texts(self, pdf_path: Path) -> Dict[int, str]:
+        """Extract text from all pages using PyMuPDF"""
+        page_texts = {}
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Check for page markers
-            page_match = re.match(r'\[PAGE (\d+)\]', line)
-            if page_match:
-                current_page = int(page_match.group(1))
-                continue
-            
-            # Check if line is a section header
-            is_header = self._is_section_header(line)
-            
-            if is_header and line:
-                # Save previous section
-                if current_section and current_content:
-                    sections.append(DocumentSection(
-                        document_name=doc_name,
-                        page_number=current_section['page'],
-                        section_title=current_section['title'],
-                        content='\n'.join(current_content).strip(),
-                        start_position=current_section['start'],
-                        end_position=i
-                    ))
-                
-                # Start new section
-                current_section = {
-                    'title': line,
-                    'page': current_page,
-                    'start': i
-                }
-                current_content = []
-            elif line and current_section:
-                current_content.append(line)
-        
-        # Add final section
-        if current_section and current_content:
-            sections.append(DocumentSection(
+        try:
+            doc = pymupdf.open(str(pdf_path))
+        except pymupdf.FileDataError:
+            # Fall back to pdfplumber for files MuPDF refuses to open
+            self.logger.warning(f"PyMuPDF could not open {pdf_path.name}, falling back to pdfplumber")
+            return self._extract_page_texts_pdfplumber(pdf_path)
+        
+        try:
+            page_count = len(doc)
+            if page_count <= PARALLEL_PAGE_THRESHOLD or self.max_workers <= 1:
+                for page_num, page in enumerate(doc):
+                    page_texts[page_num] = page.get_text("text") or ""
+                return page_texts
+        finally:
+            doc.close()
+        
+        return self._extract_page_texts_parallel(pdf_path, page_count)
+    
+    def _extract_page_texts_parallel(self, pdf_path: Path, page_count: int) -> Dict[int, str]:
+        """Extract page ranges of a large PDF in separate processes"""
+        # PyMuPDF holds the GIL and its documents are not thread-safe, so each
+        # worker process opens its own handle on the file
+        workers = min(self.max_workers, page_count)
+        chunk_size = -(-page_count // workers)
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        
+        page_texts = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_extract_page_range, pdf_path, start, stop) for start, stop in ranges]
+            for future in futures:
+                page_texts.update(future.result())
+        
+        return page_texts
+    
+    def _extract_page_texts_pdfplumber(self, pdf_path: Path) -> Dict[int, str]:
+        """Extract text from all pages using pdfplumber"""
+        page_texts = {}
+        
+        with pdfplumber.open(str(pdf_path)) as pdf:
+            for page_num, page in enumerate(pdf.pages):
+                page_texts[page_num] = page.extract_text() or ""
+        
+        return page_texts
+    
+    def _extract_sections(self, page_texts: Dict[int, str], doc_name: str) -> List[DocumentSection]:
+        """Extract sections from document text"""
+        sections = [
+            DocumentSection(
                 document_name=doc_name,
-                page_number=current_section['page'],
-                section_title=current_section['title'],
-                content='\n'.join(current_content).strip(),
-                start_position=current_section['start'],
-                end_position=len(lines)
-            ))
+                page_number=page_number,
+                section_title=title,
+                content=content,
+                start_position=start,
+                end_position=end
+            )
+            for page_number, title, content, start, end in scan_sections(page_texts)
+        ]
         
         # If no sections found, create page-based sections
         if not sections:
@@ -152,46 +232,26 @@ class DocumentProcessor:
         
         return sections
     
-    def _is_section_header(self, line: str) -> bool:
-        """Check if a line is likely a section header"""
-        if not line or len(line.strip()) < 3:
-            return False
-        
-        # Check against patterns
-        for pattern in self.section_patterns:
-            if re.match(pattern, line.strip(), re.IGNORECASE):
-                return True
-        
-        # Heuristic checks
-        if (len(line) < 100 and  # Not too long
-            line[0].isupper() and  # Starts with capital
-            not line.endswith('.') and  # Doesn't end with period (usually)
-            len(line.split()) < 15):  # Not too many words
-            return True
-        
-        return False
-    
     def _create_page_sections(self, page_texts: Dict[int, str], doc_name: str) -> List[DocumentSection]:
         """Create sections based on pages when no clear sections are found"""
         sections = []
         
         for page_num, text in page_texts.items():
-            if text.strip():
-                # Try to find a meaningful title from the first few lines
-                lines = [line.strip() for line in text.split('\n') if line.strip()]
+            content = text.strip()
+            if content:
                 title = f"Page {page_num + 1}"
                 
-                if lines:
-                    # Use first non-empty line as title if it's short enough
-                    first_line = lines[0]
-                    if len(first_line) < 80:
-                        title = f"Page {page_num + 1}: {first_line[:50]}..."
+                # Use first non-empty line as title if it's short enough; only
+                # the first line is split off since the rest of the page is not needed
+                first_line = content.split('\n', 1)[0].strip()
+                if len(first_line) < 80:
+                    title = f"Page {page_num + 1}: {first_line[:50]}..."
                 
                 sections.append(DocumentSection(
                     document_name=doc_name,
                     page_number=page_num + 1,
                     section_title=title,
-                    content=text.strip(),
+                    content=content,
                     start_position=0,
                     end_position=len(text)
                 ))
@@ -200,7 +260,16 @@ class DocumentProcessor:
     
     def extract_sections(self, documents: List[Document]) -> List[DocumentSection]:
         """Extract all sections from all documents"""
-        all_sections = []
-        for doc in documents:
-            all_sections.extend(doc.sections)
-        return all_sections
\ No newline at end of file
+        # The ranker indexes and counts sections, so materialize a single list
+        return list(itertools.chain.from_iterable(doc.sections for doc in documents))
+
+
+def _process_document(pdf_path: Path, cache_dir: Optional[Path], page_workers: int) -> Document:
+    """Process a single PDF document in a worker process"""
+    return DocumentProcessor(max_workers=page_workers, cache_dir=cache_dir)._process_document(pdf_path)
+
+
+def _extract_page_range(pdf_path: Path, start: int, stop: int) -> Dict[int, str]:
+    """Extract text from pages [start, stop) of a PDF in a worker process"""
+    with pymupdf.open(str(pdf_path)) as doc:
+        return {page_num: doc[page_num].get_text("text") or "" for page_num in range(start, stop)}
\ No newline at end of file
@@ -1,8 +1,10 @@
 """
-Output Formatter for generating the required JSON output format (limited to top 5 sections everywhere)
+Output Formatter for generating the required JSON output format (limited to the top 5 sections by default)
 """
 
+import heapq
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
@@ -10,10 +12,20 @@ from typing import List, Dict, Any
 from .document_processor import Document
 from .relevance_ranker import ScoredSection
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
 
 class OutputFormatter:
     """Formats the analysis results into the required JSON output format"""
 
+    def __init__(self, top_k_extracted: int = 5, top_k_subsection: int = 5):
+        # Number of top-ranked sections kept in each output list
+        self.top_k_extracted = top_k_extracted
+        self.top_k_subsection = top_k_subsection
+
     def format_output(
         self,
         documents: List[Document],
@@ -27,7 +39,7 @@ class OutputFormatter:
         - Only metadata keys requested
         - Only document names (no paths/pages) in input_documents
         - Only requested fields in extracted_sections and subsection_analysis
-        - Limit both sections to top 5 (by importance_rank)
+        - Limit both sections to the top k (by importance_rank, 5 by default)
         """
 
         # Base output structure
@@ -42,39 +54,48 @@ class OutputFormatter:
             "subsection_analysis": []
         }
 
-        # Sort sections by importance rank
-        output_sections = sorted(ranked_sections, key=lambda x: x.importance_rank)
+        # Select the top sections by importance rank without sorting them all
+        top_k = max(self.top_k_extracted, self.top_k_subsection)
+        top_sections = heapq.nsmallest(top_k, ranked_sections, key=lambda x: x.importance_rank)
 
-        # Only keep top 5 for extracted_sections
-        top_extracted_sections = output_sections[:5]
-        for scored_section in top_extracted_sections:
-            section = scored_section.section
-            output["extracted_sections"].append({
-                "document": section.document_name,
-                "section_title": section.section_title,
-                "importance_rank": scored_section.importance_rank,
-                "page_number": section.page_number
-            })
-
-        # Only keep top 5 for subsection_analysis as well
-        top_subsections = output_sections[:5]
-        for scored_section in top_subsections:
+        # The same top sections feed both extracted_sections and subsection_analysis
+        for position, scored_section in enumerate(top_sections):
             section = scored_section.section
-            output["subsection_analysis"].append({
-                "document": section.document_name,
-                "refined_text": scored_section.refined_text,
-                "page_number": section.page_number
-            })
+            if position < self.top_k_extracted:
+                output["extracted_sections"].append({
+                    "document": section.document_name,
+                    "section_title": section.section_title,
+                    "importance_rank": scored_section.importance_rank,
+                    "page_number": section.page_number
+                })
+            if position < self.top_k_subsection:
+                output["subsection_analysis"].append({
+                    "document": section.document_name,
+                    "refined_text": scored_section.refined_text,
+                    "page_number": section.page_number
+                })
 
         return output
 
-    def save_output(self, output_data: Dict[str, Any], output_path: str) -> None:
-        """Save the formatted output to a JSON file"""
+    def save_output(self, output_data: Dict[str, Any], output_path: str, pretty: bool = False) -> None:
+        """Save the formatted output to a JSON file (compact unless pretty is set)"""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        # Serialize up front so the file is written with a single call
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            data = orjson.dumps(output_data, option=option)
+        else:
+            data = json.dumps(output_data, indent=2 if pretty else None, ensure_ascii=False).encode('utf-8')
+
+        # Write to a temporary file and rename so readers never see a partial file
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
 
     def validate_output_format(self, output_data: Dict[str, Any]) -> bool:
         """Validate the stripped-down output format"""
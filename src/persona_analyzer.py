@@ -3,11 +3,35 @@ Persona Analyzer for extracting key characteristics and expertise areas
 """
 
 import re
-from typing import Dict, List, Set
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
 from dataclasses import dataclass
 
+import ahocorasick
 
-@dataclass
+
+# category -> tag -> matched keywords, e.g. {'domain': {'academic': {'phd'}}}
+KeywordMatches = Dict[str, Dict[str, Set[str]]]
+
+# Words too common to indicate a focus area
+_STOP_WORDS = frozenset({'the', 'and', 'for', 'with', 'from', 'this', 'that', 'have', 'will', 'can', 'are', 'was', 'were'})
+
+# Words never used as a fallback role
+_ROLE_JUNK = frozenset({'this', 'that', 'with', 'from', 'they', 'have', 'will'})
+
+# Patterns compiled once at import rather than looked up in the re cache per call
+_WORD_RE = re.compile(r'\b[a-z]+\b')
+_COMPOUND_RE = re.compile(r'\b([a-z]+\s+[a-z]+)\b')
+_SUBJECT_RE = re.compile(r'\b(?:in|of|for)\s+([a-z\s]+?)(?:\s+(?:and|or|,|\.|$))')
+_ACTION_RES = [
+    re.compile(r'(analyze|review|summarize|identify|prepare|create|develop|assess|evaluate)'),
+    re.compile(r'(find|extract|determine|compare|study|research|investigate)'),
+    re.compile(r'(focus on|looking for|need to|should|must|want to)')
+]
+_OBJECTIVE_PHRASE_RE = re.compile(r'(?:analyze|review|summarize|identify|prepare|create|develop|assess|evaluate|find|extract|determine|compare|study|research|investigate)\s+([^.!?]+)')
+
+
+@dataclass(slots=True)
 class PersonaProfile:
     """Represents analyzed persona characteristics"""
     role: str
@@ -51,28 +75,54 @@ class PersonaAnalyzer:
             'advanced': ['advanced', 'experienced', 'senior', 'graduate'],
             'expert': ['expert', 'phd', 'professor', 'specialist', 'authority', 'master']
         }
+        
+        # Single automaton over every domain/role/level keyword, so a text is
+        # scanned once instead of once per keyword
+        self._keyword_automaton = self._build_keyword_automaton()
+    
+    def _build_keyword_automaton(self) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton mapping keywords to (category, tag) pairs"""
+        keyword_tags = defaultdict(list)
+        categories = {
+            'domain': self.domain_keywords,
+            'role': self.role_patterns,
+            'level': self.technical_levels
+        }
+        for category, mapping in categories.items():
+            for tag, keywords in mapping.items():
+                for keyword in keywords:
+                    keyword_tags[keyword].append((category, tag))
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, tags in keyword_tags.items():
+            automaton.add_word(keyword, (keyword, tags))
+        automaton.make_automaton()
+        return automaton
     
     def analyze_persona(self, persona_description: str, job_description: str) -> PersonaProfile:
         """Analyze persona and job descriptions to create a profile"""
         combined_text = f"{persona_description} {job_description}".lower()
         
+        # Match all known keywords in one pass
+        persona_matches, combined_matches = self._match_keywords(combined_text, len(persona_description.lower()))
+        
         # Extract role
-        role = self._extract_role(persona_description)
+        role = self._extract_role(persona_description, persona_matches['role'])
         
         # Extract expertise areas
-        expertise_areas = self._extract_expertise_areas(combined_text)
+        expertise_areas = self._extract_expertise_areas(combined_text, combined_matches['domain'])
         
         # Extract focus keywords
         focus_keywords = self._extract_focus_keywords(combined_text)
         
         # Determine domain knowledge
-        domain_knowledge = self._determine_domain_knowledge(combined_text)
+        domain_knowledge = self._determine_domain_knowledge(combined_matches['domain'])
         
         # Extract job objectives
         job_objectives = self._extract_job_objectives(job_description)
         
         # Determine technical level
-        technical_level = self._determine_technical_level(persona_description)
+        technical_level = self._determine_technical_level(persona_description, persona_matches['level'])
         
         return PersonaProfile(
             role=role,
@@ -83,37 +133,50 @@ class PersonaAnalyzer:
             technical_level=technical_level
         )
     
-    def _extract_role(self, persona_description: str) -> str:
+    def _match_keywords(self, text: str, persona_length: int) -> Tuple[KeywordMatches, KeywordMatches]:
+        """Find keywords in the persona prefix (first persona_length characters) and in the whole text"""
+        persona_matches = defaultdict(lambda: defaultdict(set))
+        combined_matches = defaultdict(lambda: defaultdict(set))
+        
+        for end_index, (keyword, tags) in self._keyword_automaton.iter(text):
+            in_persona = end_index < persona_length
+            for category, tag in tags:
+                combined_matches[category][tag].add(keyword)
+                if in_persona:
+                    persona_matches[category][tag].add(keyword)
+        
+        return persona_matches, combined_matches
+    
+    def _extract_role(self, persona_description: str, role_matches: Dict[str, Set[str]]) -> str:
         """Extract the primary role from persona description"""
         text = persona_description.lower()
         
-        for role, patterns in self.role_patterns.items():
-            for pattern in patterns:
-                if pattern in text:
-                    return role
+        for role in self.role_patterns:
+            if role in role_matches:
+                return role
         
         # Extract first meaningful noun if no pattern matches
-        words = re.findall(r'\b[a-z]+\b', text)
+        words = _WORD_RE.findall(text)
         for word in words:
-            if len(word) > 3 and word not in ['this', 'that', 'with', 'from', 'they', 'have', 'will']:
+            if len(word) > 3 and word not in _ROLE_JUNK:
                 return word
         
         return "professional"
     
-    def _extract_expertise_areas(self, text: str) -> List[str]:
+    def _extract_expertise_areas(self, text: str, domain_matches: Dict[str, Set[str]]) -> List[str]:
         """Extract areas of expertise from the text"""
         expertise = []
         
         # Look for specific subject areas
-        subjects = re.findall(r'\b(?:in|of|for)\s+([a-z\s]+?)(?:\s+(?:and|or|,|\.|$))', text)
+        subjects = _SUBJECT_RE.findall(text)
         for subject in subjects:
             subject = subject.strip()
             if len(subject) > 2 and len(subject.split()) <= 4:
                 expertise.append(subject)
         
         # Look for domain-specific terms
-        for domain, keywords in self.domain_keywords.items():
-            if any(keyword in text for keyword in keywords):
+        for domain in self.domain_keywords:
+            if domain in domain_matches:
                 expertise.append(domain)
         
         return list(set(expertise))[:5]  # Limit to top 5
@@ -122,30 +185,24 @@ class PersonaAnalyzer:
         """Extract important keywords that indicate focus areas"""
         keywords = set()
         
-        # Extract nouns and adjectives
-        words = re.findall(r'\b[a-z]{3,}\b', text)
-        
         # Filter for meaningful terms
-        stop_words = {'the', 'and', 'for', 'with', 'from', 'this', 'that', 'have', 'will', 'can', 'are', 'was', 'were'}
-        
-        for word in words:
-            if word not in stop_words and len(word) >= 3:
+        for word in _WORD_RE.findall(text):
+            if len(word) >= 3 and word not in _STOP_WORDS:
                 keywords.add(word)
         
         # Add compound terms
-        compounds = re.findall(r'\b([a-z]+\s+[a-z]+)\b', text)
-        for compound in compounds:
+        for compound in _COMPOUND_RE.findall(text):
             if len(compound.split()) == 2:
                 keywords.add(compound)
         
         return keywords
     
-    def _determine_domain_knowledge(self, text: str) -> List[str]:
+    def _determine_domain_knowledge(self, domain_matches: Dict[str, Set[str]]) -> List[str]:
         """Determine the relevant domain knowledge areas"""
         domains = []
         
-        for domain, keywords in self.domain_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text)
+        for domain in self.domain_keywords:
+            score = len(domain_matches.get(domain, ()))
             if score >= 2:  # Threshold for domain relevance
                 domains.append(domain)
         
@@ -157,31 +214,24 @@ class PersonaAnalyzer:
         text = job_description.lower()
         
         # Look for action verbs and objectives
-        action_patterns = [
-            r'(analyze|review|summarize|identify|prepare|create|develop|assess|evaluate)',
-            r'(find|extract|determine|compare|study|research|investigate)',
-            r'(focus on|looking for|need to|should|must|want to)'
-        ]
-        
-        for pattern in action_patterns:
-            matches = re.findall(pattern, text)
+        for action_re in _ACTION_RES:
+            matches = action_re.findall(text)
             objectives.extend(matches)
         
         # Extract phrases after action verbs
-        objective_phrases = re.findall(r'(?:analyze|review|summarize|identify|prepare|create|develop|assess|evaluate|find|extract|determine|compare|study|research|investigate)\s+([^.!?]+)', text)
+        objective_phrases = _OBJECTIVE_PHRASE_RE.findall(text)
         objectives.extend([phrase.strip() for phrase in objective_phrases])
         
         return list(set(objectives))[:5]  # Limit to top 5
     
-    def _determine_technical_level(self, persona_description: str) -> str:
+    def _determine_technical_level(self, persona_description: str, level_matches: Dict[str, Set[str]]) -> str:
         """Determine the technical proficiency level"""
         text = persona_description.lower()
         
         # Check for explicit level indicators
-        for level, indicators in self.technical_levels.items():
-            for indicator in indicators:
-                if indicator in text:
-                    return level
+        for level in self.technical_levels:
+            if level in level_matches:
+                return level
         
         # Default based on role
         if any(role in text for role in ['phd', 'professor', 'expert', 'senior']):
@@ -2,16 +2,69 @@
 Relevance Ranker for scoring and ranking document sections based on persona and job
 """
 
+import heapq
+import os
 import re
-import math
-from typing import List, Dict, Tuple
-from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple
+from collections import defaultdict
 from dataclasses import dataclass
 
+import ahocorasick
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
 from .document_processor import DocumentSection
 from .persona_analyzer import PersonaProfile
 
 
+# Keyword scoring is split across processes for at least this many sections
+PARALLEL_SECTION_THRESHOLD = 5000
+
+# Sections whose cosine similarity with the query is below this are scored
+# lazily when only the top-k sections are needed
+COLD_COSINE_THRESHOLD = 0.01
+
+# Scores that depend on keyword matches; each lies in [0, 1]
+_KEYWORD_SCORES = ('keyword_match', 'domain_relevance', 'technical_alignment', 'job_alignment')
+
+# Words dropped when tokenizing sections and queries
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
+    'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
+})
+
+# Words of three or more letters; _tokenize runs for every section, query and objective
+_WORD_RE = re.compile(r'\b[a-z]{3,}\b')
+
+# Sentence boundaries used when refining section text
+_SENT_RE = re.compile(r'[.!?]+')
+
+# Words indicating that a section belongs to a knowledge domain
+DOMAIN_INDICATORS: Dict[str, FrozenSet[str]] = {
+    'academic': frozenset({'research', 'study', 'analysis', 'methodology', 'literature', 'findings', 'conclusion'}),
+    'business': frozenset({'revenue', 'profit', 'market', 'strategy', 'financial', 'investment', 'business'}),
+    'technical': frozenset({'algorithm', 'implementation', 'system', 'performance', 'technical', 'method'}),
+    'educational': frozenset({'learning', 'concept', 'understanding', 'knowledge', 'study', 'example'}),
+    'medical': frozenset({'clinical', 'patient', 'treatment', 'medical', 'health', 'therapy'}),
+    'legal': frozenset({'law', 'legal', 'regulation', 'policy', 'compliance'}),
+    'scientific': frozenset({'experiment', 'hypothesis', 'data', 'observation', 'scientific'})
+}
+
+# Words indicating the technical level a section is written for
+TECHNICAL_INDICATORS: Dict[str, FrozenSet[str]] = {
+    'beginner': frozenset({'basic', 'introduction', 'overview', 'fundamentals', 'simple'}),
+    'intermediate': frozenset({'analysis', 'application', 'implementation', 'practical'}),
+    'advanced': frozenset({'complex', 'sophisticated', 'advanced', 'detailed', 'comprehensive'}),
+    'expert': frozenset({'novel', 'innovative', 'cutting-edge', 'state-of-the-art', 'breakthrough'})
+}
+
+
 @dataclass
 class ScoredSection:
     """Represents a document section with relevance scores"""
@@ -25,17 +78,23 @@ class ScoredSection:
 class RelevanceRanker:
     """Ranks document sections based on relevance to persona and job"""
     
-    def __init__(self):
-        self.stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does',
-            'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that',
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
-            'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
-        }
+    def __init__(self, max_workers: Optional[int] = None):
+        # Number of worker processes used to score sections (defaults to CPU count)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Counts terms with our own tokenizer and scales each row by its token
+        # total (plain TF); IDF is applied separately in _calculate_tf_idf.
+        # Single precision is plenty for ranking and halves the matrix size
+        self._vectorizer = TfidfVectorizer(analyzer=self._tokenize, use_idf=False, norm='l1', dtype=np.float32)
     
-    def rank_sections(self, sections: List[DocumentSection], persona_profile: PersonaProfile, job_description: str) -> List[ScoredSection]:
-        """Rank sections by relevance to persona and job"""
+    def rank_sections(self, sections: List[DocumentSection], persona_profile: PersonaProfile, job_description: str,
+                      top_k: Optional[int] = None) -> List[ScoredSection]:
+        """Rank sections by relevance to persona and job
+        
+        With top_k set, sections with near-zero cosine similarity skip keyword
+        scoring once they cannot reach the top_k; the top_k sections and their
+        order are unchanged, but skipped sections keep keyword scores of 0.
+        Only the top_k sections get refined text; the rest get an empty string.
+        """
         
         # Calculate TF-IDF vectors for all sections
         tf_idf_vectors = self._calculate_tf_idf(sections)
@@ -43,31 +102,82 @@ class RelevanceRanker:
         # Create query vector from persona and job
         query_vector = self._create_query_vector(persona_profile, job_description, tf_idf_vectors['vocabulary'])
         
+        # Cosine similarity of every section with the query in one product
+        cosine_similarities = self._cosine_similarities(tf_idf_vectors['sections'], query_vector)
+        
+        # Objective tokens are shared by all scorers, so build them once
+        objective_tokens = [self._tokenize(objective) for objective in persona_profile.job_objectives]
+        
+        # Keywords for the scorers and for sentence refinement, built once per ranking
+        job_keywords = set(self._tokenize(job_description))
+        query_keywords = self._query_keywords(persona_profile, job_keywords)
+        refine_keywords = job_keywords.union(persona_profile.focus_keywords)
+        
+        warm_sections, cold_sections = [], []
+        for i in range(len(sections)):
+            if top_k is not None and cosine_similarities[i] < COLD_COSINE_THRESHOLD:
+                cold_sections.append(i)
+            else:
+                warm_sections.append(i)
+        
+        # Every keyword any scorer looks for, matched against each section in a single pass
+        keyword_automaton = self._build_keyword_automaton(query_keywords, objective_tokens)
+        
+        # Calculate multiple relevance scores
+        section_scores = [None] * len(sections)
+        warm_scores = self._score_sections(
+            [sections[i] for i in warm_sections],
+            [float(cosine_similarities[i]) for i in warm_sections],
+            keyword_automaton,
+            persona_profile,
+            query_keywords,
+            objective_tokens
+        )
+        for i, scores in zip(warm_sections, warm_scores):
+            section_scores[i] = scores
+        
+        if cold_sections:
+            # Keyword scores are at most 1, which bounds what a cold section can
+            # reach; once that bound is below the current k-th best score, it
+            # and every cold section after it can be left unmatched
+            top_scores = heapq.nlargest(top_k, (self._combine_scores(scores) for scores in section_scores if scores is not None))
+            heapq.heapify(top_scores)
+            
+            cold_bounds = {}
+            for i in cold_sections:
+                section_scores[i] = self._cold_relevance_scores(sections[i], float(cosine_similarities[i]))
+                cold_bounds[i] = self._combine_scores(dict(section_scores[i], **{name: 1.0 for name in _KEYWORD_SCORES}))
+            
+            for i in sorted(cold_sections, key=cold_bounds.get, reverse=True):
+                if len(top_scores) >= top_k and top_scores and cold_bounds[i] < top_scores[0]:
+                    break
+                
+                section_scores[i] = self._calculate_relevance_scores(
+                    sections[i], 
+                    self._matched_keywords(keyword_automaton, sections[i]),
+                    persona_profile, 
+                    query_keywords, 
+                    section_scores[i]['cosine_similarity'],
+                    objective_tokens
+                )
+                heapq.heappush(top_scores, self._combine_scores(section_scores[i]))
+                if len(top_scores) > top_k:
+                    heapq.heappop(top_scores)
+        
         scored_sections = []
         
         for i, section in enumerate(sections):
-            # Calculate multiple relevance scores
-            scores = self._calculate_relevance_scores(
-                section, 
-                persona_profile, 
-                job_description, 
-                tf_idf_vectors['sections'][i],
-                query_vector,
-                tf_idf_vectors['vocabulary']
-            )
+            scores = section_scores[i]
             
             # Calculate overall relevance score
             relevance_score = self._combine_scores(scores)
             
-            # Generate refined text
-            refined_text = self._refine_section_text(section, persona_profile, job_description)
-            
             scored_sections.append(ScoredSection(
                 section=section,
                 relevance_score=relevance_score,
                 importance_rank=0,  # Will be set after sorting
                 score_breakdown=scores,
-                refined_text=refined_text
+                refined_text=""  # Will be set after sorting
             ))
         
         # Sort by relevance score and assign ranks
@@ -75,58 +185,43 @@ class RelevanceRanker:
         for i, scored_section in enumerate(scored_sections):
             scored_section.importance_rank = i + 1
         
+        # Generate refined text, only for the sections that will be shown
+        for scored_section in scored_sections[:top_k]:
+            scored_section.refined_text = self._refine_section_text(scored_section.section, refine_keywords)
+        
         return scored_sections
     
     def _calculate_tf_idf(self, sections: List[DocumentSection]) -> Dict:
-        """Calculate TF-IDF vectors for all sections"""
-        # Tokenize all sections
-        section_tokens = []
-        vocabulary = set()
-        
-        for section in sections:
-            tokens = self._tokenize(section.content)
-            section_tokens.append(tokens)
-            vocabulary.update(tokens)
-        
-        vocabulary = sorted(list(vocabulary))
-        vocab_index = {word: i for i, word in enumerate(vocabulary)}
-        
-        # Calculate TF for each section
-        tf_vectors = []
-        for tokens in section_tokens:
-            token_count = Counter(tokens)
-            total_tokens = len(tokens)
-            tf_vector = [0] * len(vocabulary)
-            
-            for word, count in token_count.items():
-                if word in vocab_index:
-                    tf_vector[vocab_index[word]] = count / total_tokens
-            
-            tf_vectors.append(tf_vector)
-        
-        # Calculate IDF
+        """Calculate unit-length TF-IDF vectors for all sections as a sparse matrix"""
+        try:
+            tf_matrix = self._vectorizer.fit_transform([section.content for section in sections])
+        except ValueError:
+            # No section has a single token left after stop word removal
+            tf_matrix = sparse.csr_matrix((len(sections), 0), dtype=np.float32)
+            vocabulary = {}
+        else:
+            vocabulary = self._vectorizer.vocabulary_
+        
+        # Calculate IDF; each stored entry is a distinct (section, word) pair,
+        # so counting column occurrences gives the document frequency
         doc_count = len(sections)
-        idf_vector = [0] * len(vocabulary)
+        doc_freq = np.bincount(tf_matrix.indices, minlength=len(vocabulary))
+        idf_vector = np.log(doc_count / (doc_freq + 1)).astype(np.float32)
         
-        for i, word in enumerate(vocabulary):
-            doc_freq = sum(1 for tokens in section_tokens if word in tokens)
-            idf_vector[i] = math.log(doc_count / (doc_freq + 1))
-        
-        # Calculate TF-IDF
-        tf_idf_vectors = []
-        for tf_vector in tf_vectors:
-            tf_idf_vector = [tf * idf for tf, idf in zip(tf_vector, idf_vector)]
-            tf_idf_vectors.append(tf_idf_vector)
+        # Calculate TF-IDF, L2-normalized once here so cosine similarity with the
+        # query is a plain dot product; all-zero rows stay zero
+        tf_idf_matrix = sparse.csr_matrix(tf_matrix.multiply(idf_vector))
+        if vocabulary:
+            tf_idf_matrix = normalize(tf_idf_matrix)
         
         return {
-            'sections': tf_idf_vectors,
+            'sections': tf_idf_matrix,
             'vocabulary': vocabulary,
-            'vocab_index': vocab_index,
             'idf': idf_vector
         }
     
-    def _create_query_vector(self, persona_profile: PersonaProfile, job_description: str, vocabulary: List[str]) -> List[float]:
-        """Create query vector from persona and job description"""
+    def _create_query_vector(self, persona_profile: PersonaProfile, job_description: str, vocabulary: Dict[str, int]) -> sparse.csr_matrix:
+        """Create unit-length query vector from persona and job description"""
         # Combine all persona information
         query_text = f"{persona_profile.role} {job_description}"
         if persona_profile.expertise_areas:
@@ -138,61 +233,97 @@ class RelevanceRanker:
         if persona_profile.focus_keywords:
             query_text += " " + " ".join(persona_profile.focus_keywords)
         
-        query_tokens = self._tokenize(query_text)
-        token_count = Counter(query_tokens)
-        total_tokens = len(query_tokens)
-        
-        query_vector = [0] * len(vocabulary)
-        for i, word in enumerate(vocabulary):
-            if word in token_count:
-                query_vector[i] = token_count[word] / total_tokens
+        if not vocabulary:
+            return sparse.csr_matrix((1, 0), dtype=np.float32)
         
-        return query_vector
+        # Words outside the section vocabulary are dropped before normalizing
+        return normalize(self._vectorizer.transform([query_text]))
     
-    def _calculate_relevance_scores(self, section: DocumentSection, persona_profile: PersonaProfile, 
-                                  job_description: str, section_tf_idf: List[float], 
-                                  query_vector: List[float], vocabulary: List[str]) -> Dict[str, float]:
+    def _calculate_relevance_scores(self, section: DocumentSection, matched_keywords: Set[str], persona_profile: PersonaProfile, 
+                                  query_keywords: Set[str], cosine_similarity: float,
+                                  objective_tokens: List[List[str]]) -> Dict[str, float]:
         """Calculate multiple relevance scores for a section"""
         scores = {}
         
         # 1. Cosine similarity with query
-        scores['cosine_similarity'] = self._cosine_similarity(section_tf_idf, query_vector)
+        scores['cosine_similarity'] = cosine_similarity
         
         # 2. Keyword match score
-        scores['keyword_match'] = self._keyword_match_score(section, persona_profile, job_description)
+        scores['keyword_match'] = self._keyword_match_score(matched_keywords, query_keywords)
         
         # 3. Domain relevance score
-        scores['domain_relevance'] = self._domain_relevance_score(section, persona_profile)
+        scores['domain_relevance'] = self._domain_relevance_score(matched_keywords, persona_profile)
         
         # 4. Section importance score (based on title and position)
         scores['section_importance'] = self._section_importance_score(section)
         
         # 5. Technical level alignment
-        scores['technical_alignment'] = self._technical_alignment_score(section, persona_profile)
+        scores['technical_alignment'] = self._technical_alignment_score(matched_keywords, persona_profile)
         
         # 6. Job objective alignment
-        scores['job_alignment'] = self._job_objective_alignment(section, persona_profile)
+        scores['job_alignment'] = self._job_objective_alignment(matched_keywords, objective_tokens)
         
         return scores
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors"""
-        if not vec1 or not vec2:
-            return 0.0
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(a * a for a in vec2))
+    def _score_sections(self, sections: List[DocumentSection], cosine_similarities: List[float],
+                        keyword_automaton: ahocorasick.Automaton, persona_profile: PersonaProfile, query_keywords: Set[str],
+                        objective_tokens: List[List[str]]) -> List[Dict[str, float]]:
+        """Calculate relevance scores for each section, in worker processes for large batches"""
+        if len(sections) < PARALLEL_SECTION_THRESHOLD or self.max_workers <= 1:
+            return [
+                self._calculate_relevance_scores(
+                    section,
+                    self._matched_keywords(keyword_automaton, section),
+                    persona_profile,
+                    query_keywords,
+                    cosine,
+                    objective_tokens
+                )
+                for section, cosine in zip(sections, cosine_similarities)
+            ]
+        
+        # The scorers are pure Python, so contiguous chunks go to separate
+        # processes, each of which builds its own automaton
+        workers = min(self.max_workers, len(sections))
+        chunk_size = -(-len(sections) // workers)
+        
+        scores = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _score_section_chunk,
+                    sections[start:start + chunk_size],
+                    cosine_similarities[start:start + chunk_size],
+                    persona_profile,
+                    query_keywords,
+                    objective_tokens
+                )
+                for start in range(0, len(sections), chunk_size)
+            ]
+            for future in futures:
+                scores.extend(future.result())
         
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        return dot_product / (magnitude1 * magnitude2)
+        return scores
     
-    def _keyword_match_score(self, section: DocumentSection, persona_profile: PersonaProfile, job_description: str) -> float:
-        """Calculate score based on keyword matches"""
+    def _matched_keywords(self, keyword_automaton: ahocorasick.Automaton, section: DocumentSection) -> Set[str]:
+        """Keywords of the automaton occurring anywhere in the section title or content"""
+        # The lowercased text is built once per scored section and only lives for this scan
         section_text = (section.section_title + " " + section.content).lower()
-        
+        return {keyword for _, keyword in keyword_automaton.iter(section_text)}
+    
+    def _cold_relevance_scores(self, section: DocumentSection, cosine_similarity: float) -> Dict[str, float]:
+        """Scores for a section left out of keyword matching; keyword scores are 0"""
+        scores = {name: 0.0 for name in _KEYWORD_SCORES}
+        scores['cosine_similarity'] = cosine_similarity
+        scores['section_importance'] = self._section_importance_score(section)
+        return scores
+    
+    def _cosine_similarities(self, tf_idf_matrix: sparse.csr_matrix, query_vector: sparse.csr_matrix) -> np.ndarray:
+        """Calculate cosine similarity between every unit-length section row and the unit-length query"""
+        return (tf_idf_matrix @ query_vector.T).toarray().ravel()
+    
+    def _query_keywords(self, persona_profile: PersonaProfile, job_keywords: Set[str]) -> Set[str]:
+        """Collect keywords from the persona profile and the job description tokens"""
         # Keywords from persona
         persona_keywords = set()
         persona_keywords.update(persona_profile.focus_keywords)
@@ -200,40 +331,43 @@ class RelevanceRanker:
             for area in persona_profile.expertise_areas:
                 persona_keywords.update(area.lower().split())
         
-        # Keywords from job description
-        job_keywords = set(self._tokenize(job_description.lower()))
-        
-        all_keywords = persona_keywords.union(job_keywords)
-        
+        return persona_keywords.union(job_keywords)
+    
+    def _build_keyword_automaton(self, query_keywords: Set[str], objective_tokens: List[List[str]]) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton over every keyword the scorers look for"""
+        keywords = set(query_keywords)
+        for objective_words in objective_tokens:
+            keywords.update(objective_words)
+        for indicators in DOMAIN_INDICATORS.values():
+            keywords.update(indicators)
+        for indicators in TECHNICAL_INDICATORS.values():
+            keywords.update(indicators)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    
+    def _keyword_match_score(self, matched_keywords: Set[str], query_keywords: Set[str]) -> float:
+        """Calculate score based on how many query keywords occur in the section"""
         matches = 0
-        for keyword in all_keywords:
-            if keyword in section_text:
+        for keyword in query_keywords:
+            if keyword in matched_keywords:
                 matches += 1
         
-        return matches / max(len(all_keywords), 1)
+        return matches / max(len(query_keywords), 1)
     
-    def _domain_relevance_score(self, section: DocumentSection, persona_profile: PersonaProfile) -> float:
-        """Calculate domain relevance score"""
+    def _domain_relevance_score(self, matched_keywords: Set[str], persona_profile: PersonaProfile) -> float:
+        """Calculate domain relevance score from the keywords found in the section"""
         if not persona_profile.domain_knowledge:
             return 0.5  # Neutral score
         
-        section_text = (section.section_title + " " + section.content).lower()
-        
-        domain_indicators = {
-            'academic': ['research', 'study', 'analysis', 'methodology', 'literature', 'findings', 'conclusion'],
-            'business': ['revenue', 'profit', 'market', 'strategy', 'financial', 'investment', 'business'],
-            'technical': ['algorithm', 'implementation', 'system', 'performance', 'technical', 'method'],
-            'educational': ['learning', 'concept', 'understanding', 'knowledge', 'study', 'example'],
-            'medical': ['clinical', 'patient', 'treatment', 'medical', 'health', 'therapy'],
-            'legal': ['law', 'legal', 'regulation', 'policy', 'compliance'],
-            'scientific': ['experiment', 'hypothesis', 'data', 'observation', 'scientific']
-        }
-        
         score = 0
         for domain in persona_profile.domain_knowledge:
-            if domain in domain_indicators:
-                indicators = domain_indicators[domain]
-                matches = sum(1 for indicator in indicators if indicator in section_text)
+            if domain in DOMAIN_INDICATORS:
+                indicators = DOMAIN_INDICATORS[domain]
+                matches = len(indicators & matched_keywords)
                 score += matches / len(indicators)
         
         return min(score / len(persona_profile.domain_knowledge), 1.0)
@@ -270,41 +404,29 @@ class RelevanceRanker:
         
         return max(min(score, 1.0), 0.0)
     
-    def _technical_alignment_score(self, section: DocumentSection, persona_profile: PersonaProfile) -> float:
-        """Calculate alignment with technical level"""
-        section_text = (section.section_title + " " + section.content).lower()
-        
-        technical_indicators = {
-            'beginner': ['basic', 'introduction', 'overview', 'fundamentals', 'simple'],
-            'intermediate': ['analysis', 'application', 'implementation', 'practical'],
-            'advanced': ['complex', 'sophisticated', 'advanced', 'detailed', 'comprehensive'],
-            'expert': ['novel', 'innovative', 'cutting-edge', 'state-of-the-art', 'breakthrough']
-        }
-        
+    def _technical_alignment_score(self, matched_keywords: Set[str], persona_profile: PersonaProfile) -> float:
+        """Calculate alignment with technical level from the keywords found in the section"""
         target_level = persona_profile.technical_level
-        if target_level not in technical_indicators:
+        if target_level not in TECHNICAL_INDICATORS:
             return 0.5
         
-        indicators = technical_indicators[target_level]
-        matches = sum(1 for indicator in indicators if indicator in section_text)
+        indicators = TECHNICAL_INDICATORS[target_level]
+        matches = len(indicators & matched_keywords)
         
         return min(matches / len(indicators), 1.0)
     
-    def _job_objective_alignment(self, section: DocumentSection, persona_profile: PersonaProfile) -> float:
-        """Calculate alignment with job objectives"""
-        if not persona_profile.job_objectives:
+    def _job_objective_alignment(self, matched_keywords: Set[str], objective_tokens: List[List[str]]) -> float:
+        """Calculate alignment with job objectives, given each objective's tokens"""
+        if not objective_tokens:
             return 0.5
         
-        section_text = (section.section_title + " " + section.content).lower()
-        
         alignment_score = 0
-        for objective in persona_profile.job_objectives:
-            objective_words = self._tokenize(objective.lower())
-            matches = sum(1 for word in objective_words if word in section_text)
+        for objective_words in objective_tokens:
+            matches = sum(1 for word in objective_words if word in matched_keywords)
             if objective_words:
                 alignment_score += matches / len(objective_words)
         
-        return min(alignment_score / len(persona_profile.job_objectives), 1.0)
+        return min(alignment_score / len(objective_tokens), 1.0)
     
     def _combine_scores(self, scores: Dict[str, float]) -> float:
         """Combine individual scores into overall relevance score"""
@@ -325,29 +447,26 @@ class RelevanceRanker:
         
         return total_score
     
-    def _refine_section_text(self, section: DocumentSection, persona_profile: PersonaProfile, job_description: str) -> str:
-        """Create refined text focused on persona needs"""
+    def _refine_section_text(self, section: DocumentSection, all_keywords: Set[str]) -> str:
+        """Create refined text focused on persona needs, given the persona focus and job keywords"""
         content = section.content
         
         # Extract most relevant sentences
-        sentences = re.split(r'[.!?]+', content)
+        sentences = _SENT_RE.split(content)
         
         # Score sentences based on keyword presence
-        persona_keywords = set()
-        persona_keywords.update(persona_profile.focus_keywords)
-        job_keywords = set(self._tokenize(job_description.lower()))
-        all_keywords = persona_keywords.union(job_keywords)
+        lowered_keywords = [keyword.lower() for keyword in all_keywords]
         
         scored_sentences = []
         for sentence in sentences:
             sentence = sentence.strip()
             if len(sentence) > 20:  # Ignore very short sentences
-                score = sum(1 for keyword in all_keywords if keyword.lower() in sentence.lower())
+                lowered_sentence = sentence.lower()
+                score = sum(1 for keyword in lowered_keywords if keyword in lowered_sentence)
                 scored_sentences.append((score, sentence))
         
-        # Take top sentences
-        scored_sentences.sort(key=lambda x: x[0], reverse=True)
-        top_sentences = [sentence for score, sentence in scored_sentences[:5]]
+        # Take top sentences; nlargest keeps ties in document order like a stable sort
+        top_sentences = [sentence for score, sentence in heapq.nlargest(5, scored_sentences, key=lambda x: x[0])]
         
         refined_text = '. '.join(top_sentences)
         
@@ -361,11 +480,16 @@ class RelevanceRanker:
     
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text into words, removing stop words and short words"""
-        # Convert to lowercase and extract words
-        words = re.findall(r'\b[a-z]+\b', text.lower())
-        
-        # Filter stop words and short words
-        filtered_words = [word for word in words 
-                         if word not in self.stop_words and len(word) >= 3]
-        
-        return filtered_words
\ No newline at end of file
+        # Convert to lowercase, extract words of three or more letters and filter stop words
+        return [word for word in _WORD_RE.findall(text.lower()) if word not in _STOP_WORDS]
+
+
+def _score_section_chunk(sections: List[DocumentSection], cosine_similarities: List[float],
+                         persona_profile: PersonaProfile, query_keywords: Set[str],
+                         objective_tokens: List[List[str]]) -> List[Dict[str, float]]:
+    """Score a contiguous chunk of sections in a worker process"""
+    ranker = RelevanceRanker(max_workers=1)
+    keyword_automaton = ranker._build_keyword_automaton(query_keywords, objective_tokens)
+    return ranker._score_sections(
+        sections, cosine_similarities, keyword_automaton, persona_profile, query_keywords, objective_tokens
+    )
@@ -0,0 +1,103 @@
+"""
+Section scanning loop for DocumentProcessor
+
+This module has no project imports so it can be compiled in place with Cython
+(cythonize -i src/section_scanner.py); the plain Python module is used otherwise.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Common section header patterns
+SECTION_PATTERNS = [
+    r'^(\d+\.?\s+[A-Z][^.!?]*(?:[.!?]|$))',  # Numbered sections
+    r'^([A-Z][A-Z\s]{2,}[^.!?]*(?:[.!?]|$))',  # ALL CAPS headers
+    r'^(Abstract|Introduction|Methodology|Results|Discussion|Conclusion|References)',  # Common academic sections
+    r'^(Executive Summary|Background|Analysis|Findings|Recommendations)',  # Business sections
+    r'^(Chapter \d+|Section \d+|Part \d+)',  # Textbook sections
+]
+
+# Compiled once at import; matched against every line of every document
+# as a single alternation so each line is scanned by the engine only once
+_COMBINED_HEADER_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in SECTION_PATTERNS), re.IGNORECASE
+)
+
+# (page_number, section_title, content, start_position, end_position)
+RawSection = Tuple[int, str, str, int, int]
+
+
+def is_section_header(line: str) -> bool:
+    """Check if an already stripped line is likely a section header"""
+    length: int = len(line)
+    if length < 3:
+        return False
+
+    # Every pattern needs a leading letter or digit and the heuristic an
+    # uppercase character (which includes symbols such as circled letters),
+    # so lines starting with bullets or punctuation are rejected before any regex
+    first_char: str = line[0]
+    if not (first_char.isalnum() or first_char.isupper()):
+        return False
+
+    # Check against patterns
+    if _COMBINED_HEADER_RE.match(line):
+        return True
+
+    # Heuristic checks
+    if (length < 100 and  # Not too long
+        first_char.isupper() and  # Starts with capital
+        not line.endswith('.') and  # Doesn't end with period (usually)
+        len(line.split()) < 15):  # Not too many words
+        return True
+
+    return False
+
+
+def scan_sections(page_texts: Dict[int, str]) -> List[RawSection]:
+    """Group page lines into sections, each starting at a header line"""
+    sections: list = []
+
+    current_title: Optional[str] = None
+    current_page: int = 0
+    current_start: int = 0
+    current_content: list = []
+    index: int = 0
+
+    for page_num in sorted(page_texts):
+        page_number: int = page_num + 1
+        for raw_line in page_texts[page_num].split('\n'):
+            line: str = raw_line.strip()
+            if line:
+                if is_section_header(line):
+                    # Save previous section
+                    if current_title is not None and current_content:
+                        sections.append((
+                            current_page,
+                            current_title,
+                            '\n'.join(current_content).strip(),
+                            current_start,
+                            index
+                        ))
+
+                    # Start new section
+                    current_title = line
+                    current_page = page_number
+                    current_start = index
+                    current_content = []
+                elif current_title is not None:
+                    current_content.append(line)
+            index += 1
+
+    # Add final section
+    if current_title is not None and current_content:
+        sections.append((
+            current_page,
+            current_title,
+            '\n'.join(current_content).strip(),
+            current_start,
+            index
+        ))
+
+    return sections
@@ -51,7 +51,7 @@ def check_model_size():
     # Get installed package sizes
     import pkg_resources
     total_size = 0
-    packages = ['pdfplumber', 'numpy']
+    packages = ['PyMuPDF', 'pdfplumber', 'numpy', 'scipy', 'scikit-learn', 'pyahocorasick']
     
     for package in packages:
         try:
@@ -63,7 +63,7 @@ def check_model_size():
     # Our system uses lightweight methods, no large models
     print("    Using lightweight TF-IDF and rule-based methods")
     print("    No large language models or embeddings")
-    print("    Total dependencies < 50MB (well under 1GB limit)")
+    print("    Total dependencies ~400MB installed (under 1GB limit)")
     return True
 
 